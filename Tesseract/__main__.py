@@ -9,6 +9,19 @@ import sys
 
 # TODO tkinter dialogue
 
+_NON_A50 = re.compile(rf'[^{re.escape(_A50)}]')
+_UTF16_WORD = re.compile(r'....')
+_A50_DISPLAY = str.maketrans({'\x1E': '\n\n', '\x1B': '\u241B'})
+
+
+def _escape_non_a50(m):
+  return _UTF16_WORD.sub(_escape_utf16_word, m[0].encode('utf-16le', errors='surrogateescape').hex().upper())
+
+
+def _escape_utf16_word(m):
+  return f'\x1bW{m[0]}'
+
+
 def encode():
   arg1 = sys.argv[1] if len(sys.argv) > 1 else None
   if arg1 is None:
@@ -16,7 +29,7 @@ def encode():
     if x == '50':
       print('type your message\n(Only alphanumerics. Enter one paragraph per line, and a blank line when done.)')
       x = '\x1E'.join(iter(lambda: input('> '), '')).upper()
-      x = re.sub(rf'[^{re.escape(_A50)}]', lambda m: re.sub(r'....', lambda m: f'\x1bW{m[0]}', m[0].encode('utf-16le', errors='surrogateescape').hex().upper()), x)
+      x = _NON_A50.sub(_escape_non_a50, x)
       cs = str50_to_cubes(x)
     elif x == 'f':
       p = Path(input('specify the file path.\n> '))
@@ -40,7 +53,7 @@ def decode():
   cs = list(map(Cube, iter(lambda: input('> '), '')))
   x = input('Were you expecting a FILE, or a SIMPLE TEXT message?\nType "50" and press Enter for simple text; or type "f" and press Enter for a file.\n> ')
   if x == '50':
-    m = cubes_to_str50(cs).replace('\x1E', '\n\n').replace('\x1B', '\u241B')
+    m = cubes_to_str50(cs).translate(_A50_DISPLAY)
     print(f'Your message is:\n\n{m}\n')
   elif x == 'f':
     data = cubes_to_bytes(cs)
@@ -6,12 +6,10 @@ __all__ = ['bytes_to_cube', 'cube_to_bytes']
 
 def bytes_to_cube(s):
     i = octet_rank(s)
-    p = _Cube.GROUP.coset_unrank(i)
-    c = _Cube(p)
+    c = Cube(i)
     return c
 
 def cube_to_bytes(c):
-    p = c._permutation
-    c = _Cube.GROUP.coset_rank(p)
-    s = octet_unrank(c)
+    i = int(c)
+    s = octet_unrank(i)
     return s
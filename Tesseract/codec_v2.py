@@ -3,8 +3,7 @@ from .cube import Cube
 from .multiset import Multiset
 
 from itertools import count
-from math import comb
-import sys
+from math import comb, factorial, lgamma, log, log2
 
 __all__ = ['bytes_to_cubes', 'cubes_to_bytes', 'str50_to_cubes', 'cubes_to_str50']
 
@@ -12,35 +11,27 @@ __all__ = ['bytes_to_cubes', 'cubes_to_bytes', 'str50_to_cubes', 'cubes_to_str50
 def bytes_to_cubes(s, *, Cube=Cube):
     N = Cube.GROUP.order()  # 43_252_003_274_489_856_000
     x = octet_rank(s)
-    cs = Multiset()
-    for j in _nat_to_nbag(x, N):
-        p = Cube.GROUP.coset_unrank(j)
-        c = Cube(p)
-        cs.add(c)
-    return cs
+    js = _nat_to_nbag(x, N)
+    return Multiset.fromcounter({Cube(j): js.count(j) for j in js.support()})
 
 
 def str50_to_cubes(s, *, Cube=Cube):
     N = Cube.GROUP.order()
     x = str50_rank(s)
-    cs = Multiset()
-    for j in _nat_to_nbag(x, N):
-        p = Cube.GROUP.coset_unrank(j)
-        c = Cube(p)
-        cs.add(c)
-    return cs
+    js = _nat_to_nbag(x, N)
+    return Multiset.fromcounter({Cube(j): js.count(j) for j in js.support()})
 
 
 def cubes_to_bytes(cs, *, Cube=Cube):
     N = Cube.GROUP.order()  # 43_252_003_274_489_856_000
-    js = ( Cube.GROUP.coset_rank(c._permutation) for c in cs )
+    js = map(int, cs)
     x = _nbag_to_nat(js, N)
     return octet_unrank(x)
 
 
 def cubes_to_str50(cs, *, Cube=Cube):
     N = Cube.GROUP.order()  # 43_252_003_274_489_856_000
-    js = ( Cube.GROUP.coset_rank(c._permutation) for c in cs )
+    js = map(int, cs)
     x = _nbag_to_nat(js, N)
     return str50_unrank(x)
 
@@ -48,52 +39,65 @@ def cubes_to_str50(cs, *, Cube=Cube):
 def _nat_to_nbag(x, n):
     if x == 0: return Multiset()
     # 1. Calculate k
-    bias = 1
+    # Bags smaller than k number multicomb(n + 1, k - 1) (see _nbag_to_nat), so we want
+    # multicomb(n + 1, k - 1) <= x < multicomb(n + 1, k). Estimate k from
+    # log2(multicomb(n + 1, k)) ~= k*log2(n) - log2(k!), then fix it up exactly.
     k = 1
-    while not (x - bias) in range(multicomb(n, k)):
-        bias += multicomb(n, k)
+    if n > 1:
+        for _ in range(4):
+            k = max(1, round((log2(x) + lgamma(k + 1) / log(2)) / log2(n)))
+    bias = multicomb(n + 1, k - 1)
+    while bias > x:
+        k -= 1
+        bias = multicomb(n + 1, k - 1)
+    upper = multicomb(n + 1, k)
+    while upper <= x:
         k += 1
+        bias, upper = upper, multicomb(n + 1, k)
 
     # 2. Natural -> Combination
     s = _nat_to_kcomb(x - bias, k)
 
     # 3. Combination -> Multiset
-    return Multiset( (elem - i) for (i, elem) in enumerate(sorted(s)) )
+    return Multiset( (elem - i) for (i, elem) in enumerate(s) )
 
 
 def _nbag_to_nat(ms, n):
-    # 1. Multiset -> Combination
-    s = set( (x + i) for (i, x) in enumerate(sorted(ms)) )
+    ms = sorted(ms)
 
-    # 2. Calculate bias
-    bias = sum(multicomb(n, k) for k in range(len(s)))
+    # 1. Calculate bias
+    # sum(multicomb(n, k) for k in range(K)) == multicomb(n + 1, K - 1) (hockey-stick identity)
+    bias = multicomb(n + 1, len(ms) - 1) if ms else 0
 
-    # 3. Combination -> Natural
-    return _kcomb_to_nat(s) + bias
+    # 2. Multiset -> Combination -> Natural
+    return _kcomb_to_nat( (x + i) for (i, x) in enumerate(ms) ) + bias
 
 
 def _nat_to_kcomb(x, k):
     """https://en.wikipedia.org/wiki/Combinatorial_number_system#Finding_the_k-combination_for_a_given_number
+
+    Returns the combination in ascending order.
     """
     x = int(x)
     if k < 1 and x > 0:
         raise ValueError(f"can't represent {x} as a {k}-combination (k too small)")
 
-    result = set()
+    result = []
     for i in reversed(range(k)):
-        elem = _search_maxsatisfying(lambda n: not comb(n, i+1) > x)  # TODO performance
-        assert elem not in result
-        result.add(elem)
-        x -= comb(elem, i+1)
+        elem, c = _comb_floor_inverse(x, i+1)
+        assert not result or elem < result[-1]
+        result.append(elem)
+        x -= c
+    result.reverse()
     return result
 
 
 def _kcomb_to_nat(s):
     """https://en.wikipedia.org/wiki/Combinatorial_number_system#Place_of_a_combination_in_the_ordering
 
-    Inverse of ``_nat_to_kcomb``.
+    Inverse of ``_nat_to_kcomb``; *s* must be in ascending order.
     """
-    return sum(comb(elem, i+1) for i, elem in enumerate(sorted(s)))
+    return sum(comb(elem, i+1) for i, elem in enumerate(s))
 
 
 def multicomb(n, k):
@@ -102,32 +106,39 @@ def multicomb(n, k):
     return comb((n + k - 1), k)
 
 
-def _search_maxsatisfying(predicate, *, start=0, _increasefunc=lambda n, base=sys.maxsize+1: n*base):
-    """Return the largest integer *n* for which predicate(n) succeeds
-
-    predicate must have a nowhere-positive derivative.
-    start value must satisfy predicate."""
-    if start < 0:
-        offset = -start
-        return search_maxsatisfying(lambda guess: predicate(guess - offset), start=0, _increasefunc=_increasefunc) - offset
-    lower_bound = start
-    upper_bound = lower_bound + 1
-    if not predicate(lower_bound):
-        raise ValueError("start value does not satisfy predicate")
-
-    # 1. Exponential approach to establish upper-bound
-    while predicate(upper_bound):
-        lower_bound, upper_bound = upper_bound, _increasefunc(upper_bound)
-    guess = lower_bound
-
-    # 2. Binary search
-    while (upper_bound - lower_bound) > 1:
-        guess = lower_bound + (upper_bound - lower_bound) // 2
-        if not predicate(guess):
-            upper_bound = guess
-            guess = lower_bound
-        else:
-            lower_bound = guess
-
-    assert predicate(guess) and not predicate(guess+1)
-    return guess
+def _comb_floor_inverse(x, k):
+    """Return the largest *n* for which comb(n, k) <= x, along with comb(n, k)
+    """
+    if x == 0:
+        return k - 1, 0
+    # comb(n, k) ~= (n - (k-1)/2)**k / k!, so this lands within a step or two
+    n = max(k, _iroot(x * factorial(k), k) + (k - 1) // 2)
+    c = comb(n, k)
+    while c > x:
+        c = c * (n - k) // n  # comb(n-1, k)
+        n -= 1
+    while True:
+        c_next = c * (n + 1) // (n + 1 - k)  # comb(n+1, k)
+        if c_next > x:
+            return n, c
+        n, c = n + 1, c_next
+
+
+def _iroot(a, n):
+    """Return the largest integer *x* for which x**n <= a
+    """
+    if a < 2:
+        return a
+    # Floating-point estimate (rounded up), then Newton's method
+    e = log2(a) / n
+    x = ((int(2 ** (e % 1 + 53) * (1 + 2**-30)) << int(e)) >> 53) + 1
+    while True:
+        y = ((n - 1) * x + a // x**(n - 1)) // n
+        if y >= x:
+            break
+        x = y
+    while x**n > a:
+        x -= 1
+    while (x + 1)**n <= a:
+        x += 1
+    return x
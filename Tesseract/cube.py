@@ -1,13 +1,32 @@
 import sympy.combinatorics  # python -m pip install "sympy >= 0.7.2"
 import kociemba as _kociemba  # python -m pip install "kociemba >= 1.2"
 
+from functools import lru_cache
+from itertools import accumulate
+from operator import mul
+
+
+def _piece_colormap(pieces, color_indices):
+    return {
+        # Mapping from SETS of sticker colors
+        frozenset(color_indices[i] for i in piece):
+        # to (Mapping from INDIVIDUAL sticker colors to sticker positions)
+        {color_indices[i]: i for i in piece}
+      for piece in pieces
+    }
+
+
+def _solverstring_table(color_letters, color_indices):
+    # bytes.translate table: sticker number -> solverstring letter
+    return ''.join(map(color_letters.__getitem__, color_indices)).encode('ascii').ljust(256, b'\0')
+
 
 class Cube:
     """Immutable class representing a Rubik's Cube.
 
     May represent "illegal" states.
     """
-    __slots__ = ['__impl', '_hash']
+    __slots__ = ['__impl']
 
     @classmethod
     def random_cube(cls):
@@ -16,6 +35,7 @@ class Cube:
 
     _COLORS = (15, 10, 1, 4, 3, 11)  # Override this to re-color a subclass!
     _COLOR_LETTERS = ('w', 'g', 'r', 'b', 'o', 'y')
+    _COLOR_LETTER_INDICES = {c: i for i, c in enumerate(_COLOR_LETTERS)}
     _COLOR_INDICES = (
         0, 0, 0,
         0, 0, 0,
@@ -29,18 +49,16 @@ class Cube:
         5, 5, 5,
         5, 5, 5,
     )
+    _SOLVERSTRING_TABLE = _solverstring_table(_COLOR_LETTERS, _COLOR_INDICES)
 
     def __hash__(self):
-        if self._hash is None:
-            self._hash = hash( (self._permutation, frozenset(frozenset(piece) for piece in self.POLYHEDRON_FACES), self.GROUP))
-        return self._hash
+        return hash(self.__impl)
 
     def __repr__(self):
         stickers = [self._COLORS[self._COLOR_INDICES[i]] for i in self.__impl]
-        solverstring = ''.join(self._COLOR_LETTERS[self._COLOR_INDICES[i]] for i in self.__impl)
-        solution = [self.MOVES[m] for m in _kociemba.solve(self._alt_str('github.com/muodov/kociemba')).split()]
-        creation = [~m for m in reversed(solution)]
-        creation_str = ' '.join(_dindex(self.MOVES, m) for m in creation)
+        solverstring = str(self)
+        solution = _kociemba.solve(self._alt_str('github.com/muodov/kociemba')).split()
+        creation_str = ' '.join(self._INVERSE_MOVE_NAMES[m] for m in reversed(solution))
         #if inspect.stack()[1].filename != '<stdin>':
         #    # https://stackoverflow.com/questions/77719065
         #    return f'{self.__class__.__name__}({solverstring!r})'
@@ -100,6 +118,7 @@ class Cube:
         (0, 18, 17), (2, 15, 14), (6, 9, 20), (8, 12, 11), (33, 45, 44), (35, 36, 47), (38, 39, 53), (41, 42, 51),
         (4,), (22,), (25,), (28,), (31,), (49,),
     ]
+    _PIECE_COLORMAP = _piece_colormap(POLYHEDRON_FACES, _COLOR_INDICES)
 
     MOVES['U2'] = MOVES['U']**2
     MOVES['F2'] = MOVES['F']**2
@@ -115,54 +134,65 @@ class Cube:
     MOVES["L'"] = MOVES['L']**3
     MOVES["D'"] = MOVES['D']**3
 
+    _MOVE_NAMES = {v: k for k, v in MOVES.items()}
+    # e.g. "U" -> "U'", "U'" -> "U", "U2" -> "U2"
+    _INVERSE_MOVE_NAMES = dict(zip(MOVES, map(_MOVE_NAMES.__getitem__, (~p for p in MOVES.values()))))
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Rebuild the derived lookup tables from whatever the subclass overrode
+        cls._COLOR_LETTER_INDICES = {c: i for i, c in enumerate(cls._COLOR_LETTERS)}
+        cls._SOLVERSTRING_TABLE = _solverstring_table(cls._COLOR_LETTERS, cls._COLOR_INDICES)
+        cls._PIECE_COLORMAP = _piece_colormap(cls.POLYHEDRON_FACES, cls._COLOR_INDICES)
+
     @classmethod
     def _solverstring_to_permutation(cls, s):
-        stickers = [cls._COLOR_LETTERS.index(c) for c in s]
+        try:
+            stickers = [cls._COLOR_LETTER_INDICES[c] for c in s]
+        except KeyError as err:
+            raise ValueError(f'{err.args[0]!r} is not a color letter') from None
         p = [None] * cls.GROUP.degree
 
-        _colormap = {
-            # Mapping from SETS of sticker colors
-            frozenset(cls._COLOR_INDICES[i] for i in piece):
-            # to (Mapping from INDIVIDUAL sticker colors to sticker positions)
-            {cls._COLOR_INDICES[i]: i for i in piece}
-          for piece in cls.POLYHEDRON_FACES
-        }
-
         for cur_piece in cls.POLYHEDRON_FACES:
             # First, we pick some piece (SAY the Front-Up edge)...
             # ...and figure out what the hell actually landed in it.
-            cur_colors = {cls._COLOR_LETTERS.index(s[i]) for i in cur_piece}
+            cur_colors = {stickers[i] for i in cur_piece}
             # then, we figure out where these stickers that HAVE landed in our piece
             # came from originally
-            src_colormap = _colormap[frozenset(cur_colors)]
+            src_colormap = cls._PIECE_COLORMAP[frozenset(cur_colors)]
             # then we record exactly where each of our stickers came from
             for cur_index in cur_piece:
-                cur_color = cls._COLOR_LETTERS.index(s[cur_index])
+                cur_color = stickers[cur_index]
                 assert p[cur_index] is None
                 p[cur_index] = src_colormap[cur_color]
         assert None not in p
 
         return sympy.combinatorics.Permutation(p)
 
+    # Sticker orderings used by other tools, as gather indices into our own
+    # (i.e. the array forms of the relabelling permutations; p_mod * p == p[p_mod])
+    _ALT_STR_ORDER = {
+        'rubiks-cube-solver.com': tuple(sympy.combinatorics.Permutation(53)(9, 18)(10, 19)(11, 20)(12, 30, 24, 33, 36, 15, 42, 39, 27)(13, 31, 25, 34, 37, 16, 43, 40, 28)(14, 32, 26, 35, 38, 17, 44, 41, 29).array_form),
+        'github.com/muodov/kociemba': tuple(sympy.combinatorics.Permutation(53)(9, 12, 24, 33, 51, 39, 30, 48, 27, 45, 15, 36, 18)(10, 13, 25, 34, 52, 40, 31, 49, 28, 46, 16, 37, 19)(11, 14, 26, 35, 53, 41, 32, 50, 29, 47, 17, 38, 20).array_form),
+    }
+
     @property
     def _permutation(self):
-        return self.__impl
+        return sympy.combinatorics.Permutation(list(self.__impl))
 
     def _alt_str(self, version):
         if version == 'rubiks-cube-solver.com':
-            p_mod = sympy.combinatorics.Permutation(53)(9, 18)(10, 19)(11, 20)(12, 30, 24, 33, 36, 15, 42, 39, 27)(13, 31, 25, 34, 37, 16, 43, 40, 28)(14, 32, 26, 35, 38, 17, 44, 41, 29)
-            p = p_mod * self._permutation
+            p = [self.__impl[i] for i in self._ALT_STR_ORDER[version]]
             color_letters = ('1', '3', '4', '5', '2', '6')
             return f'https://rubiks-cube-solver.com/solution.php?cube=0{"".join(color_letters[self._COLOR_INDICES[i]] for i in p)}'
         elif version == 'github.com/muodov/kociemba':
-            p_mod = sympy.combinatorics.Permutation(53)(9, 12, 24, 33, 51, 39, 30, 48, 27, 45, 15, 36, 18)(10, 13, 25, 34, 52, 40, 31, 49, 28, 46, 16, 37, 19)(11, 14, 26, 35, 53, 41, 32, 50, 29, 47, 17, 38, 20)
-            p = p_mod * self._permutation
+            p = [self.__impl[i] for i in self._ALT_STR_ORDER[version]]
             color_letters = ('U', 'F', 'R', 'B', 'L', 'D')
             return ''.join(color_letters[self._COLOR_INDICES[i]] for i in p)
         raise ValueError(version)
 
     def __str__(self):
-        return ''.join(self._COLOR_LETTERS[self._COLOR_INDICES[sticker_number]] for sticker_number in self.__impl)
+        return self.__impl.translate(self._SOLVERSTRING_TABLE).decode('ascii')
 
     def __init__(self, initializer=None):
         if initializer is None:
@@ -174,19 +204,30 @@ class Cube:
             p = initializer
         elif isinstance(initializer, int):
             p = self.GROUP.coset_unrank(initializer)
+            if p is None:
+                raise ValueError(f'{initializer} is out of range for {self.__class__.__name__}.GROUP')
         else:
             raise TypeError(f'Non-Implemented Cube initializer type: {type(initializer)}')
-        self.__impl = p
-        self._hash = None
+        # Flat sticker array: position -> home position, one byte each (degree 54)
+        self.__impl = bytes(p.array_form)
+
+    def __int__(self):
+        """Inverse of ``Cube(i)``; same as ``GROUP.coset_rank``"""
+        orbit_indices, weights = _coset_rank_tables(self.GROUP)
+        factors = self.GROUP.coset_factor(self._permutation, True)
+        if not factors:
+            raise ValueError(f'{self} is not in {self.__class__.__name__}.GROUP')
+        return sum(w * index[f] for index, w, f in zip(orbit_indices, weights, factors))
 
     def __eq__(self, other):
         if not isinstance(other, Cube):
             return NotImplemented
-        return (self.GROUP, self._permutation) == (other.GROUP, other._permutation)
+        return (self.GROUP, self.__impl) == (other.GROUP, other.__impl)
 
 
-def _dindex(d, x):
-    try:
-        return next(k for k,v in d.items() if v == x)
-    except StopIteration:
-        raise ValueError(x)
\ No newline at end of file
+@lru_cache(maxsize=None)
+def _coset_rank_tables(group):
+    """Mixed-radix digit lookups and place values for ranking against group's stabilizer chain"""
+    orbit_indices = [{point: j for j, point in enumerate(orbit)} for orbit in group.basic_orbits]
+    weights = list(accumulate(map(len, group.basic_orbits), mul, initial=1))[:-1]
+    return orbit_indices, weights
@@ -1,7 +1,6 @@
-from sortedcontainers import SortedDict  # python -m pip install sortedcontainers
-
 from collections import Counter
-from collections.abc import Hashable, Mapping
+from collections.abc import Mapping
+from functools import lru_cache
 from itertools import chain, repeat, starmap
 from math import isqrt
 from numbers import Real
@@ -9,33 +8,44 @@ import warnings
 
 
 class Multiset:
-    __slots__ = ['__impl']
+    __slots__ = ['__impl', '__sorted', '__len']
 
     @classmethod
+    @lru_cache(maxsize=8192)
     def _key(cls, obj):
+        # Elements are Counter keys, so always hashable
         if isinstance(obj, Real):
             return (0, obj)
         elif isinstance(obj, tuple):
             return (1, tuple(map(cls._key, obj)))
-        elif isinstance(obj, Hashable):
-            return (2, hash(obj))
         else:
-            return (3, id(obj))
+            return (2, hash(obj))
 
     def __init__(self, iterable_or_collection=None):
-        self.__impl = SortedDict(self._key)
+        self.__impl = Counter()
+        self.__sorted = None  # Lazily-built sorted view of the support
+        self.__len = 0
 
         if iterable_or_collection is not None:
             if isinstance(iterable_or_collection, Mapping):
                 warnings.warn('Did you mean Multiset.fromcounter()?')
-            for elem in iterable_or_collection:
-                self.add(elem)
+                iterable_or_collection = iter(iterable_or_collection)
+            self.__impl.update(iterable_or_collection)
+            self.__len = sum(self.__impl.values())
+
+    @classmethod
+    def __fromimpl(cls, impl):
+        self = cls()
+        self.__impl = impl
+        self.__len = sum(impl.values())
+        return self
 
     @classmethod
     def fromcounter(cls, counter):
         self = cls()
-        for elem, count in counter.items():
-            self.add(elem, _count=count)
+        assert all(isinstance(count, int) and count > 0 for count in counter.values())
+        self.__impl.update(counter)
+        self.__len = sum(self.__impl.values())
         return self
 
     def count(self, elem):
@@ -46,7 +56,7 @@ class Multiset:
             return f'{self.__class__.__name__}()'
         if isqrt(len(self)) > self.support_len():
             # Alternate repr when multiplicity is EXCESSIVE
-            d = dict(self.__impl)
+            d = {elem: self.__impl[elem] for elem in self.__sorted_support()}
             return f'{self.__class__.__name__}.fromcounter({d!r})'
         l = list(self)
         return f'{self.__class__.__name__}({l!r})'
@@ -61,11 +71,39 @@ class Multiset:
         return len(self.__impl.keys())
 
     def __len__(self):
-        return sum(self.__impl.values())
+        return self.__len
+
+    def __sorted_support(self):
+        if self.__sorted is None:
+            self.__sorted = sorted(self.__impl, key=self._key)
+        return self.__sorted
+
+    def __unsort(self, elem):
+        # Drop elem from the cached sorted support, if there is one
+        support = self.__sorted
+        if support is None:
+            return
+        key = self._key(elem)
+        lo, hi = 0, len(support)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(support[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        # Distinct elements may share a key (hash collision); scan the tie
+        for i in range(lo, len(support)):
+            if support[i] == elem:
+                del support[i]
+                return
+            if self._key(support[i]) != key:
+                break
+        self.__sorted = None
 
     def __iter__(self):
-        items = self.__impl.items()
-        yield from chain.from_iterable(starmap(repeat, items))
+        support = self.__sorted_support()
+        items = zip(support, map(self.__impl.__getitem__, support))
+        return chain.from_iterable(starmap(repeat, items))
 
     def __bool__(self):
         return bool(self.__impl)
@@ -73,7 +111,10 @@ class Multiset:
     def add(self, elem, *, _count=1):
         assert isinstance(_count, int) and _count > 0
         cur_count = self.__impl.get(elem, 0)
+        if cur_count == 0:
+            self.__sorted = None
         self.__impl[elem] = cur_count + _count
+        self.__len += _count
 
     def remove(self, elem, *, _count=1):
         assert isinstance(_count, int) and _count > 0
@@ -81,81 +122,103 @@ class Multiset:
         if cur_count == 0:
             raise KeyError(elem)
         assert cur_count >= _count
+        self.__len -= _count
         if cur_count == _count:
             del self.__impl[elem]
+            self.__unsort(elem)
         else:
             self.__impl[elem] = cur_count - _count
 
     def discard(self, elem):
         if elem in self.__impl:
-            del self.__impl[elem]
+            self.__len -= self.__impl.pop(elem)
+            self.__unsort(elem)
 
     def pop(self):
         if not self:
             raise KeyError('pop from an empty Multiset')
-        elem = next(reversed(self.__impl))
-        self.remove(elem)
+        support = self.__sorted_support()
+        elem = support[-1]
+        cur_count = self.__impl[elem]
+        self.__len -= 1
+        if cur_count == 1:
+            del self.__impl[elem]
+            support.pop()
+        else:
+            self.__impl[elem] = cur_count - 1
         return elem
 
     def clear(self):
         self.__impl.clear()
+        self.__sorted = None
+        self.__len = 0
 
     def __add__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__add__ TODO')
+        return self.__fromimpl(self.__impl + other.__impl)
 
     def __sub__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__sub__ TODO')
+        return self.__fromimpl(self.__impl - other.__impl)
 
     def __and__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__and__ TODO')
+        # Counter.__and__ walks its left operand; make that the smaller support
+        a, b = self.__impl, other.__impl
+        if len(b) < len(a):
+            a, b = b, a
+        return self.__fromimpl(a & b)
 
     def __or__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__or__ TODO')
+        return self.__fromimpl(self.__impl | other.__impl)
 
     def __xor__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__xor__ TODO')
+        return self.__fromimpl((self.__impl - other.__impl) + (other.__impl - self.__impl))
 
     def isdisjoint(self, other):
         if not isinstance(other, Multiset):
             raise TypeError(f'Multiset.isdisjoint: expected Multiset, got {type(other)}')
-        raise NotImplementedError('Multiset.isdisjoint TODO')
+        return self.__impl.keys().isdisjoint(other.__impl.keys())
+
+    def __included_in(self, other):
+        if len(self) > len(other):
+            return False
+        other_impl = other.__impl
+        return all(count <= other_impl[elem] for elem, count in self.__impl.items())
 
-    def __le___(self, other):
+    def __le__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__le__ TODO')
+        return self.__included_in(other)
 
-    def __lt___(self, other):
+    def __lt__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__lt__ TODO')
+        return len(self) < len(other) and self.__included_in(other)
 
-    def __ge___(self, other):
+    def __ge__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__ge__ TODO')
+        return other.__included_in(self)
 
-    def __gt___(self, other):
+    def __gt__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        raise NotImplementedError('Multiset.__gt__ TODO')
+        return len(self) > len(other) and other.__included_in(self)
 
     def __eq__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        return self.__impl == other.__impl
+        return len(self) == len(other) and self.__impl == other.__impl
 
     def __ne__(self, other):
         if not isinstance(other, Multiset):
             return NotImplemented
-        return self.__impl != other.__impl
+        return len(self) != len(other) or self.__impl != other.__impl
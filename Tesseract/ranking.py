@@ -1,39 +1,88 @@
+from math import log2
+
+
 def octet_rank(s):
-    k = 2**8
-    result = 0
-    for c in s:
-        result *= k
-        result += c + 1
-    return result
+    # Same as _bijective_rank(s, 2**8), but with the base conversion done by int.from_bytes
+    return int.from_bytes(s, 'big') + ((1 << (8 * len(s))) - 1) // 255
 
 
 def octet_unrank(i):
-    k = 2**8
-    result = []
-    while i != 0:
-        i, c = divmod(i - 1, k)
-        result.append(c)
-    return bytes(reversed(result))
+    # Length L is the largest for which (256**L - 1)//255 <= i
+    L = ((255 * i + 1).bit_length() - 1) // 8
+    return (i - ((1 << (8 * L)) - 1) // 255).to_bytes(L, 'big')
 
 
 _A50 = ' ABCDEFGHIJKLMNOPQRSTUVWXYZ\x1E\x1B\t0123456789'
+_A50_INDICES = {c: i for i, c in enumerate(_A50)}
+_A50_TABLE = _A50.encode('ascii').ljust(256, b'\0')  # bytes.translate table: digit -> character
 
 
 def str50_rank(s):
-    A = _A50
-    k = len(A)
-    result = 0
-    for c in s:
-        result *= k
-        result += A.index(c) + 1
-    return result
+    try:
+        digits = [_A50_INDICES[c] for c in s]
+    except KeyError as err:
+        raise ValueError(f'{err.args[0]!r} is not a Radix-50 character') from None
+    return _bijective_rank(digits, len(_A50))
 
 
 def str50_unrank(i):
-    A = _A50
-    k = len(A)
+    return bytes(_bijective_unrank(i, len(_A50))).translate(_A50_TABLE).decode('ascii')
+
+
+def _chunk_len(k):
+    # Digits per step, so that each chunk stays a (roughly) machine-word-sized int
+    return max(1, 60 // k.bit_length())
+
+
+def _bijective_rank(digits, k):
+    """Shortlex rank of a sequence of base-*k* digits (i.e. its value as a bijective base-*k* numeral)
+
+    Works a chunk of digits at a time, so the big result is only touched once per chunk."""
+    if k < 1:
+        raise ValueError(f'base must be at least 1, not {k}')
+    if k == 1:
+        # Unary: every sequence is all zeroes, so it's ranked by its length alone
+        return len(digits)
+    m = _chunk_len(k)
+    K = k**m
+    result = 0
+    for j in range(0, len(digits), m):
+        chunk = digits[j:j+m]
+        c = 0
+        for d in chunk:
+            c = c*k + d
+        result = result * (K if len(chunk) == m else k**len(chunk)) + c
+    # Plus the number of shorter sequences, sum(k**j for j in range(L))
+    return result + (k**len(digits) - 1) // (k - 1)
+
+
+def _bijective_unrank(i, k):
+    """Inverse of ``_bijective_rank``; returns a list of digits"""
+    if k < 1:
+        raise ValueError(f'base must be at least 1, not {k}')
+    if k == 1:
+        return [0] * i
+    # Find the length L for which (k**L - 1)//(k - 1) <= i < (k**(L+1) - 1)//(k - 1)
+    t = i * (k - 1) + 1
+    L = int((t.bit_length() - 1) / log2(k))
+    P = k**L
+    while P > t:
+        L, P = L - 1, P // k
+    while P * k <= t:
+        L, P = L + 1, P * k
+    i -= (P - 1) // (k - 1)
+
+    # What's left is a plain L-digit base-k number
+    m = _chunk_len(k)
+    K = k**m
     result = []
-    while i != 0:
-        i, c = divmod(i - 1, k)
-        result.append(c)
-    return ''.join(A[c] for c in reversed(result))
+    for _ in range(L // m):
+        i, c = divmod(i, K)
+        for _ in range(m):
+            c, d = divmod(c, k)
+            result.append(d)
+    for _ in range(L % m):
+        i, d = divmod(i, k)
+        result.append(d)
+    result.reverse()
+    return result